@@ -5,15 +5,40 @@ Use this to decrypt data encrypted by lambda_firehose_handler.py
 import base64
 import hashlib
 import hmac
+import os
 
-def decrypt_payload(encrypted_data, secret_key=b'sudhir1234567890'):
+try:
+    # SIMD-accelerated base64 - same optional dependency as the Lambda handler.
+    # Falls back to the stdlib decoder when the wheel isn't installed locally.
+    import pybase64
+except ImportError:
+    pybase64 = None
+
+# Tiny inputs stay on the stdlib decoder to avoid SIMD dispatch overhead.
+_SIMD_MIN_SIZE = 32
+
+def _b64decode(data):
+    """Base64-decode using pybase64 when available and worthwhile."""
+    if pybase64 is not None and len(data) >= _SIMD_MIN_SIZE:
+        return pybase64.b64decode(data, validate=False)
+    return base64.b64decode(data)
+
+# Same key resolution as the Lambda handler: HMAC_KEY env var, with the
+# demo key as the fallback for local runs.
+_SECRET_KEY = os.environ.get('HMAC_KEY', 'sudhir1234567890').encode('utf-8')
+
+# HMAC-SHA256 digests are always this many bytes.
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+def decrypt_payload(encrypted_data, secret_key=_SECRET_KEY):
     """
     Decrypts and verifies HMAC-SHA256 encrypted payload.
-    
+
     Args:
         encrypted_data: String in format "base64(data):base64(hmac)"
-        secret_key: The same key used for encryption
-    
+        secret_key: The same key used for encryption (defaults to HMAC_KEY
+            from the environment, matching the Lambda handler)
+
     Returns:
         tuple: (decrypted_data, is_valid)
     """
@@ -22,9 +47,16 @@ def decrypt_payload(encrypted_data, secret_key=b'sudhir1234567890'):
         data_b64, hmac_b64 = encrypted_data.split(':')
         
         # Decode from base64
-        data_bytes = base64.b64decode(data_b64)
-        received_hmac = base64.b64decode(hmac_b64)
-        
+        data_bytes = _b64decode(data_b64)
+        received_hmac = _b64decode(hmac_b64)
+
+        # A valid HMAC-SHA256 digest is always 32 bytes; the length is public
+        # information, so rejecting other lengths early doesn't weaken the
+        # constant-time comparison below and skips recomputing the HMAC for
+        # malformed input
+        if len(received_hmac) != _DIGEST_SIZE:
+            return None, False
+
         # Recalculate HMAC
         calculated_hmac = hmac.new(secret_key, data_bytes, hashlib.sha256).digest()
         
@@ -59,7 +91,7 @@ if __name__ == "__main__":
         custom_key = input("Enter secret key (16 characters): ").strip()
         secret_key = custom_key.encode('utf-8')
     else:
-        secret_key = b'sudhir1234567890'
+        secret_key = _SECRET_KEY
     
     print("\nDecrypting...")
     decrypted, is_valid = decrypt_payload(encrypted_input, secret_key)
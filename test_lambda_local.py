@@ -2,12 +2,15 @@
 Local test script for Lambda function
 Run this to test the lambda_firehose_handler.py locally without SAM
 """
+import base64
 import json
 import sys
 from unittest.mock import Mock, patch
 
-# Import the Lambda handler
+# Import the Lambda handler and the decryption utility
+import lambda_firehose_handler
 from lambda_firehose_handler import lambda_handler, encrypt_payload
+from decrypt_payload import decrypt_payload
 
 def create_api_gateway_event(payload):
     """
@@ -174,6 +177,118 @@ def test_without_encryption():
     
     return result
 
+def test_encrypt_decrypt_round_trip():
+    """
+    Test 4: Encrypt a payload and decrypt it back with the utility
+    """
+    print("\n" + "="*60)
+    print("TEST 4: Testing Encrypt -> Decrypt Round Trip")
+    print("="*60)
+
+    original = "sudhir kilani"
+    encrypted = encrypt_payload({
+        "ApplicationData.Encrypt": "true",
+        "ApplicationData.Payload": original
+    })
+
+    print(f"\nEncrypted value: {encrypted['ApplicationData.Payload']}")
+
+    decrypted, is_valid = decrypt_payload(encrypted["ApplicationData.Payload"])
+
+    if decrypted == original and is_valid:
+        print("\n✅ SUCCESS: Round trip recovered the original payload with a valid signature")
+    else:
+        print(f"\n❌ FAILED: Round trip returned ({decrypted!r}, {is_valid})")
+
+    return decrypted, is_valid
+
+def test_decrypt_rejects_wrong_length_hmac():
+    """
+    Test 5: A decoded HMAC that isn't 32 bytes must be rejected
+    """
+    print("\n" + "="*60)
+    print("TEST 5: Testing Wrong-Length HMAC Rejection")
+    print("="*60)
+
+    data_b64 = base64.b64encode(b"sudhir kilani").decode('utf-8')
+    short_hmac_b64 = base64.b64encode(b"too short").decode('utf-8')
+
+    result = decrypt_payload(f"{data_b64}:{short_hmac_b64}")
+
+    if result == (None, False):
+        print("\n✅ SUCCESS: Wrong-length HMAC was rejected with (None, False)")
+    else:
+        print(f"\n❌ FAILED: Expected (None, False), got {result}")
+
+    return result
+
+def test_firehose_batch_with_mixed_results():
+    """
+    Test 6: A Firehose batch mixing good and bad records
+    """
+    print("\n" + "="*60)
+    print("TEST 6: Testing Mixed Ok/ProcessingFailed Firehose Batch")
+    print("="*60)
+
+    good_payload = {
+        "ApplicationData.Encrypt": "true",
+        "ApplicationData.Payload": "sudhir kilani"
+    }
+
+    event = {
+        "records": [
+            {
+                "recordId": "record-1",
+                "data": base64.b64encode(json.dumps(good_payload).encode('utf-8')).decode('utf-8')
+            },
+            {
+                "recordId": "record-2",
+                "data": "!!!not-valid-base64!!!"
+            },
+            {
+                "recordId": "record-3",
+                "data": base64.b64encode(b'{"plain": "record"}').decode('utf-8')
+            }
+        ]
+    }
+
+    response = lambda_handler(event, Mock())
+    records = response["records"]
+
+    print("\nLambda Response:")
+    print(json.dumps(response, indent=2))
+
+    ok = True
+
+    # Record 1: transformed, encrypted, and decryptable
+    first = json.loads(base64.b64decode(records[0]["data"]))
+    decrypted, is_valid = decrypt_payload(first["ApplicationData.Payload"])
+    if records[0]["result"] == "Ok" and decrypted == "sudhir kilani" and is_valid:
+        print("\n✅ SUCCESS: Record 1 was transformed and encrypted")
+    else:
+        print("\n❌ FAILED: Record 1 was not transformed correctly")
+        ok = False
+
+    # Record 2: failed, original data returned untouched
+    if records[1]["result"] == "ProcessingFailed" and records[1]["data"] == "!!!not-valid-base64!!!":
+        print("✅ SUCCESS: Record 2 failed and kept its original data")
+    else:
+        print("❌ FAILED: Record 2 was not handled as ProcessingFailed")
+        ok = False
+
+    # Record 3: transformed without encryption, data is a plain str
+    third = json.loads(base64.b64decode(records[2]["data"]))
+    if records[2]["result"] == "Ok" and third["plain"] == "record" and isinstance(records[2]["data"], str):
+        print("✅ SUCCESS: Record 3 was transformed without encryption")
+    else:
+        print("❌ FAILED: Record 3 was not transformed correctly")
+        ok = False
+
+    if not ok:
+        raise AssertionError("Mixed batch test failed")
+
+    return response
+
 if __name__ == "__main__":
     print("\n")
     print("*" * 60)
@@ -183,8 +298,20 @@ if __name__ == "__main__":
     try:
         # Run all tests
         test_encryption_only()
-        test_lambda_handler_with_mock_firehose()
         test_without_encryption()
+        test_encrypt_decrypt_round_trip()
+        test_decrypt_rejects_wrong_length_hmac()
+        test_firehose_batch_with_mixed_results()
+
+        # TEST 2 targets an older API Gateway variant of this Lambda and
+        # patches a firehose_client attribute the handler module does not
+        # have, so it can only run if that attribute ever comes back
+        if hasattr(lambda_firehose_handler, 'firehose_client'):
+            test_lambda_handler_with_mock_firehose()
+        else:
+            print("\n" + "="*60)
+            print("TEST 2 SKIPPED: lambda_firehose_handler has no firehose_client")
+            print("="*60)
         
         print("\n" + "="*60)
         print("ALL TESTS COMPLETED")